@@ -1,11 +1,15 @@
-from flask import Flask,render_template,request
+from flask import Flask,render_template,request,jsonify
 from src.logger import logger
 from src.pipeline.prediction_pipeline import PredictionPipeline,Custom_Data
+from src.pipeline.shadow_pipeline import ShadowEvaluator
 import numpy as np
 
 application = Flask(__name__)
 app = application
 
+# Optional candidate model scored in a separate process (see shadow_pipeline.py)
+shadow_evaluator = ShadowEvaluator().start()
+
 @app.route("/")
 def homepage():
     return render_template("index.html")
@@ -17,18 +21,25 @@ def predict():
     try:
         # Safely convert numeric fields
         try:
-            log_carat = float(request.form.get("log_carat"))
-            volume = float(request.form.get("volume"))
+            carat = float(request.form.get("carat"))
+            x = float(request.form.get("x"))
+            y = float(request.form.get("y"))
+            z = float(request.form.get("z"))
             depth = float(request.form.get("depth"))
             table = float(request.form.get("table"))
+            # log1p(carat) and x*y*z are only meaningful for positive measurements
+            if not all(np.isfinite(v) and v > 0 for v in (carat, x, y, z)):
+                raise ValueError("carat, x, y and z must be positive")
         except (ValueError, TypeError):
             logger.error("Invalid numeric input received.")
             return render_template("form.html", error="Invalid input: Please enter valid numeric values"), 400
 
         # Create data object
         data = Custom_Data(
-            log_carat=log_carat,
-            volume=volume,
+            carat=carat,
+            x=x,
+            y=y,
+            z=z,
             depth=depth,
             table=table,
             cut=request.form.get("cut"),
@@ -38,7 +49,7 @@ def predict():
 
         final_new_data = data.gather_data_as_dataframe()
 
-        prediction_pipeline = PredictionPipeline()
+        prediction_pipeline = PredictionPipeline(shadow_evaluator=shadow_evaluator)
         log_pred = prediction_pipeline.predict(final_new_data)
 
         # Your model predicts log(price)
@@ -56,5 +67,10 @@ def predict():
         return render_template("form.html", error="Something went wrong. Please try again."), 500
         
 
+@app.route("/shadow")
+def shadow_metrics():
+    return jsonify(shadow_evaluator.snapshot())
+
+
 if __name__ == "__main__":
      app.run(host="0.0.0.0",port=5001,debug=True)
\ No newline at end of file
@@ -0,0 +1,38 @@
+import os
+import sys
+import shutil
+import secrets
+import tempfile
+import subprocess
+from src.pipeline.shadow_pipeline import read_shadow_config
+
+# One shadow evaluator process per deployment, shared by every gunicorn worker,
+# so SHADOW_MAX_CPU_SHARE is the total budget regardless of the worker count.
+shadow_process = None
+shadow_dir = None
+
+
+def on_starting(server):
+    global shadow_process, shadow_dir
+    if read_shadow_config().sample_rate <= 0:
+        return
+
+    # Private socket directory and auth key for this deployment, exported before
+    # the workers fork so they and the evaluator share the same channel.
+    shadow_dir = tempfile.mkdtemp(
+        prefix="gemstone_shadow_", dir="/tmp" if os.path.isdir("/tmp") else None
+    )
+    os.environ["SHADOW_ADDRESS"] = os.path.join(shadow_dir, "shadow.sock")
+    os.environ["SHADOW_AUTHKEY"] = secrets.token_hex(32)
+
+    shadow_process = subprocess.Popen(
+        [sys.executable, "-m", "src.pipeline.shadow_pipeline"]
+    )
+
+
+def on_exit(server):
+    if shadow_process is not None:
+        shadow_process.terminate()
+        shadow_process.wait()
+    if shadow_dir is not None:
+        shutil.rmtree(shadow_dir, ignore_errors=True)
@@ -6,6 +6,11 @@ from dataclasses import dataclass
 import mlflow
 import traceback
 from src.utils import save_object
+from src.components.feature_engineering import (
+    FeatureEngineering,
+    NUMERICAL_COLUMNS,
+    CATEGORICAL_COLUMNS,
+)
 from sklearn.pipeline import Pipeline
 from sklearn.compose import ColumnTransformer
 from sklearn.preprocessing import StandardScaler
@@ -30,8 +35,8 @@ class DataTransformation:
         with mlflow.start_run(nested=True):
             try:
                 logger.info("Attempting to Transform the data through pipeline...")
-                num_column = ["depth", "table", "volume", "log_carat"]
-                cat_column = ["cut", "color", "clarity"]
+                num_column = NUMERICAL_COLUMNS
+                cat_column = CATEGORICAL_COLUMNS
 
                 cut_cat = ["Fair", "Good", "Very Good", "Premium", "Ideal"]
                 color_cat = ["D", "E", "F", "G", "H", "I", "J"]
@@ -50,13 +55,20 @@ class DataTransformation:
                     ]
                 )
 
-                preprocessor = ColumnTransformer(
+                column_transformer = ColumnTransformer(
                     [
                         ("num_pipeline", num_pipeline, num_column),
                         ("cat_pipeline", cat_pipeline, cat_column),
                     ]
                 )
 
+                preprocessor = Pipeline(
+                    steps=[
+                        ("feature_engineering", FeatureEngineering()),
+                        ("column_transformer", column_transformer),
+                    ]
+                )
+
                 logger.info("Transformation Pipeline Successfully Created...")
 
                 return preprocessor
@@ -83,38 +95,19 @@ class DataTransformation:
                 train_df = pd.read_csv(train_path)
                 test_df = pd.read_csv(test_path)
 
-                train_df["log_price"] = np.log1p(train_df["price"])
-                test_df["log_price"] = np.log1p(test_df["price"])
-
-                train_df["log_carat"] = np.log1p(train_df["carat"])
-                test_df["log_carat"] = np.log1p(test_df["carat"])
-
-                train_df["volume"] = train_df["x"] * train_df["y"] * train_df["z"]
-                test_df["volume"] = test_df["x"] * test_df["y"] * test_df["z"]
-
-                target = ["log_price"]
-                drop_column = ["log_price", "price", "carat", "x", "y", "z"]
-
-                input_feature_train_df = train_df.drop(drop_column, axis=1)
-                input_target_train_df = train_df[target]
-
-                input_feature_test_df = test_df.drop(drop_column, axis=1)
-                input_target_test_df = test_df[target]
+                # log_carat and volume are derived inside the preprocessor,
+                # so only the target is computed here.
+                input_target_train_arr = np.log1p(train_df["price"].to_numpy())
+                input_target_test_arr = np.log1p(test_df["price"].to_numpy())
 
                 logger.info("Obtaining Preprocessor Object...")
                 preprocessor_obj = self.gather_transformation_obj()
 
-                input_feature_train_arr = preprocessor_obj.fit_transform(
-                    input_feature_train_df
-                )
-                input_feature_test_arr = preprocessor_obj.transform(
-                    input_feature_test_df
-                )
+                input_feature_train_arr = preprocessor_obj.fit_transform(train_df)
+                input_feature_test_arr = preprocessor_obj.transform(test_df)
 
-                train_arr = np.c_[
-                    input_feature_train_arr, np.array(input_target_train_df)
-                ]
-                test_arr = np.c_[input_feature_test_arr, np.array(input_target_test_df)]
+                train_arr = np.c_[input_feature_train_arr, input_target_train_arr]
+                test_arr = np.c_[input_feature_test_arr, input_target_test_arr]
 
                 save_object(
                     file_path=self.transformation_config.preprocessor_file_path,
@@ -0,0 +1,78 @@
+import sys
+from src.exception import CustomException
+from src.logger import logger
+from sklearn.base import BaseEstimator, TransformerMixin
+from sklearn.pipeline import Pipeline
+import pandas as pd
+import numpy as np
+
+
+RAW_MEASUREMENT_COLUMNS = ["carat", "x", "y", "z"]
+ENGINEERED_COLUMNS = ["volume", "log_carat"]
+NUMERICAL_COLUMNS = ["depth", "table"] + ENGINEERED_COLUMNS
+CATEGORICAL_COLUMNS = ["cut", "color", "clarity"]
+FEATURE_COLUMNS = NUMERICAL_COLUMNS + CATEGORICAL_COLUMNS
+
+_legacy_preprocessor_warned = False
+
+
+class FeatureEngineering(BaseEstimator, TransformerMixin):
+    """
+    Derives the model features from the raw gemstone measurements.
+    The same object is saved inside the preprocessor artifact so training, the web app
+    and any batch scorer all compute log_carat and volume in exactly the same way.
+    """
+
+    def fit(self, X, y=None):
+        return self
+
+    def transform(self, X):
+        """
+        This function is used to build the engineered feature frame from the column arrays.
+        arg1: DataFrame with the raw carat, x, y, z columns plus depth, table, cut, color, clarity
+        """
+        try:
+            carat = X["carat"].to_numpy(dtype=np.float64)
+            volume = X["x"].to_numpy(dtype=np.float64) * X["y"].to_numpy(dtype=np.float64)
+            volume *= X["z"].to_numpy(dtype=np.float64)
+
+            engineered = {"volume": volume, "log_carat": np.log1p(carat)}
+            features = {
+                col: engineered[col] if col in engineered else X[col].to_numpy()
+                for col in FEATURE_COLUMNS
+            }
+
+            return pd.DataFrame(features, index=X.index)
+
+        except Exception as e:
+            logger.error(f"Exception occured while trying to engineer the features: {e}")
+            raise CustomException(e, sys)
+
+    def get_feature_names_out(self, input_features=None):
+        return np.asarray(FEATURE_COLUMNS, dtype=object)
+
+
+def with_feature_engineering(preprocessor):
+    """
+    This function is used to make sure a loaded preprocessor accepts the raw measurements.
+    Artifacts trained before the feature step existed are a bare ColumnTransformer expecting
+    log_carat and volume, so they are wrapped behind FeatureEngineering until regenerated.
+    arg1: preprocessor object loaded from the artifacts folder
+    """
+    global _legacy_preprocessor_warned
+
+    if isinstance(preprocessor, Pipeline) and "feature_engineering" in preprocessor.named_steps:
+        return preprocessor
+
+    # The prediction pipeline reloads the artifact per request, so only warn once
+    if not _legacy_preprocessor_warned:
+        _legacy_preprocessor_warned = True
+        logger.warning(
+            "Preprocessor artifact has no feature_engineering step, wrapping it for raw inputs..."
+        )
+    return Pipeline(
+        steps=[
+            ("feature_engineering", FeatureEngineering()),
+            ("column_transformer", preprocessor),
+        ]
+    )
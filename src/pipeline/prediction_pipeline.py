@@ -1,20 +1,23 @@
 import os
 import sys
 import mlflow
+import time
 import traceback
 from src.utils import load_object
+from src.components.feature_engineering import with_feature_engineering
 from src.exception import CustomException
 from src.logger import logger
 import pandas as pd
 
 
 class PredictionPipeline:
-    def __init__(self) -> None:
-        pass
+    def __init__(self, shadow_evaluator=None) -> None:
+        self.shadow_evaluator = shadow_evaluator
 
     def predict(self, features):
         """
         This function is used to make prediction.
+        arg1: DataFrame with the raw carat, x, y, z, depth, table, cut, color, clarity columns
         """
         with mlflow.start_run(nested=True):
             try:
@@ -22,11 +25,16 @@ class PredictionPipeline:
                 preprocessor_file_path = os.path.join("artifacts", "preprocessor.pkl")
                 model_file_path = os.path.join("artifacts", "model.pkl")
 
-                preprocessor = load_object(preprocessor_file_path)
+                preprocessor = with_feature_engineering(load_object(preprocessor_file_path))
                 model = load_object(model_file_path)
 
+                start = time.perf_counter()
                 data_scaled = preprocessor.transform(features)
                 pred = model.predict(data_scaled)
+                latency = time.perf_counter() - start
+
+                if self.shadow_evaluator is not None:
+                    self.shadow_evaluator.submit(features, pred, latency)
 
                 return pred
             except Exception as e:
@@ -39,18 +47,22 @@ class PredictionPipeline:
 
 class Custom_Data:
     def __init__(self,
+        carat: float,
+        x: float,
+        y: float,
+        z: float,
         depth: float,
         table: float,
-        volume: float,
-        log_carat: float,
         cut: object,
         color: object,
         clarity: object,
     ):
+        self.carat = carat
+        self.x = x
+        self.y = y
+        self.z = z
         self.depth = depth
         self.table = table
-        self.volume = volume
-        self.log_carat = log_carat
         self.cut = cut
         self.color = color
         self.clarity = clarity
@@ -64,10 +76,12 @@ class Custom_Data:
                 logger.info("Attempting to create custom DataFrame...")
 
                 custom_data_dict = {
+                    "carat": [self.carat],
+                    "x": [self.x],
+                    "y": [self.y],
+                    "z": [self.z],
                     "depth": [self.depth],
                     "table": [self.table],
-                    "volume": [self.volume],
-                    "log_carat": [self.log_carat],
                     "cut": [self.cut],
                     "color": [self.color],
                     "clarity": [self.clarity]
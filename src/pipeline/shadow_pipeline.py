@@ -0,0 +1,450 @@
+import os
+import time
+import pickle
+import queue
+import stat
+import random
+import threading
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener
+from src.utils import load_object
+from src.components.feature_engineering import with_feature_engineering
+from src.logger import logger
+from dataclasses import dataclass
+
+
+_STOP = object()
+_STATS_REQUEST = b"stats"
+
+
+@dataclass
+class ShadowConfig:
+    """
+    Settings shared by the web workers and the shadow evaluator process.
+    max_cpu_share is a per-deployment budget: a single evaluator process (started once by
+    the gunicorn master, see gunicorn.conf.py) scores the samples sent by every worker.
+    address and authkey are generated per deployment by gunicorn.conf.py; without them
+    shadowing stays off.
+    """
+
+    candidate_model_file_path: str = os.path.join("artifacts", "candidate", "model.pkl")
+    candidate_preprocessor_file_path: str = os.path.join(
+        "artifacts", "candidate", "preprocessor.pkl"
+    )
+    address: str = None
+    authkey: bytes = None
+    backlog: int = 64
+    sample_rate: float = 0.0
+    max_cpu_share: float = 0.1
+    queue_size: int = 64
+
+    def __post_init__(self):
+        # NaN fails every comparison, so it falls through to the lower bound
+        if not 0.0 <= self.sample_rate <= 1.0:
+            self.sample_rate = 1.0 if self.sample_rate > 1.0 else 0.0
+        if not 0.01 <= self.max_cpu_share <= 1.0:
+            self.max_cpu_share = 1.0 if self.max_cpu_share > 1.0 else 0.01
+        self.queue_size = max(int(self.queue_size), 1)
+
+
+def read_shadow_config():
+    """
+    This function is used to build the shadow config from the SHADOW_* environment variables.
+    An unparsable value disables shadowing instead of failing the live app.
+    """
+    try:
+        authkey = os.getenv("SHADOW_AUTHKEY")
+        return ShadowConfig(
+            address=os.getenv("SHADOW_ADDRESS"),
+            authkey=authkey.encode() if authkey else None,
+            sample_rate=float(os.getenv("SHADOW_SAMPLE_RATE", "0.0")),
+            max_cpu_share=float(os.getenv("SHADOW_MAX_CPU_SHARE", "0.1")),
+            queue_size=int(os.getenv("SHADOW_QUEUE_SIZE", "64")),
+        )
+    except ValueError as e:
+        logger.error(f"Invalid shadow configuration, shadow evaluation disabled: {e}")
+        return ShadowConfig(sample_rate=0.0)
+
+
+def candidate_is_available(config: ShadowConfig):
+    return (
+        config.sample_rate > 0
+        and os.path.exists(config.candidate_model_file_path)
+        and os.path.exists(config.candidate_preprocessor_file_path)
+    )
+
+
+def channel_is_configured(config: ShadowConfig):
+    return bool(config.address) and bool(config.authkey)
+
+
+class RunningStats:
+    """
+    Streaming mean / variance / min / max (Welford), so no per-request values are kept.
+    """
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = float("inf")
+        self.max = float("-inf")
+
+    def update(self, value: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def as_dict(self):
+        if self.count == 0:
+            return {"count": 0}
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "std": (self.m2 / self.count) ** 0.5,
+            "min": self.min,
+            "max": self.max,
+        }
+
+
+class ShadowServer:
+    """
+    Dedicated evaluator process that scores the candidate model on samples sent by the
+    web workers. It runs at the lowest scheduling priority, so it only uses CPU the live
+    workers leave idle, and sleeps after every job to stay under config.max_cpu_share.
+    """
+
+    def __init__(self, config: ShadowConfig = None) -> None:
+        self.shadow_config = config or read_shadow_config()
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=self.shadow_config.queue_size)
+        self._live_latency = RunningStats()
+        self._shadow_latency = RunningStats()
+        self._delta = RunningStats()
+        self._abs_delta = RunningStats()
+        self._received = 0
+        self._dropped = 0
+        self._errors = 0
+        self._closing = False
+        self._listener = None
+        self._threads = []
+
+    def load(self):
+        """
+        This function is used to load the candidate artifacts.
+        A missing or unloadable candidate leaves the evaluator disabled.
+        """
+        if not candidate_is_available(self.shadow_config):
+            logger.info("Shadow evaluation disabled: sample rate is zero or no candidate found.")
+            return self
+
+        try:
+            logger.info("Loading candidate model for shadow evaluation...")
+            self._preprocessor = with_feature_engineering(
+                load_object(self.shadow_config.candidate_preprocessor_file_path)
+            )
+            self._model = load_object(self.shadow_config.candidate_model_file_path)
+            if hasattr(self._model, "n_jobs"):
+                self._model.n_jobs = 1
+            self.enabled = True
+        except Exception as e:
+            logger.error(f"Exception occured while trying to load the candidate model: {e}")
+            self.enabled = False
+
+        return self
+
+    def start(self):
+        """
+        This function is used to start listening for samples from the web workers.
+        """
+        if not self.enabled:
+            return self
+
+        if not channel_is_configured(self.shadow_config):
+            logger.error(
+                "Shadow evaluator not started: SHADOW_ADDRESS and SHADOW_AUTHKEY must be set."
+            )
+            self.enabled = False
+            return self
+
+        # Only clear a stale socket from a previous run, never an arbitrary file
+        address = self.shadow_config.address
+        if os.path.exists(address):
+            if not stat.S_ISSOCK(os.lstat(address).st_mode):
+                logger.error(f"Shadow evaluator not started: {address} is not a socket.")
+                self.enabled = False
+                return self
+            os.remove(address)
+        self._listener = Listener(
+            address, backlog=self.shadow_config.backlog, authkey=self.shadow_config.authkey
+        )
+
+        self._scorer = threading.Thread(target=self._score, name="shadow-scorer", daemon=True)
+        self._acceptor = threading.Thread(target=self._accept, name="shadow-accept", daemon=True)
+        self._scorer.start()
+        self._acceptor.start()
+
+        logger.info(f"Shadow evaluator listening on {address}")
+        return self
+
+    def serve_forever(self):
+        self._scorer.join()
+
+    def close(self):
+        """
+        This function is used to stop the evaluator once the queued samples are scored.
+        """
+        if self._listener is None:
+            return
+
+        self._closing = True
+        try:
+            # Wake the accept loop so it can see the closing flag
+            Client(self.shadow_config.address, authkey=self.shadow_config.authkey).close()
+        except OSError:
+            pass
+        self._acceptor.join()
+        self._listener.close()
+        self._listener = None
+
+        for thread in self._threads:
+            thread.join(timeout=1)
+        self._queue.put(_STOP)
+        self._scorer.join()
+
+    def snapshot(self):
+        """
+        This function is used to read the current streaming aggregates.
+        """
+        with self._lock:
+            return {
+                "received": self._received,
+                "dropped": self._dropped,
+                "errors": self._errors,
+                "live_latency_seconds": self._live_latency.as_dict(),
+                "shadow_latency_seconds": self._shadow_latency.as_dict(),
+                "prediction_delta": self._delta.as_dict(),
+                "abs_prediction_delta": self._abs_delta.as_dict(),
+            }
+
+    def _accept(self):
+        while not self._closing:
+            try:
+                conn = self._listener.accept()
+            except AuthenticationError:
+                continue
+            except OSError:
+                break
+            if self._closing:
+                conn.close()
+                break
+            thread = threading.Thread(target=self._serve, args=(conn,), daemon=True)
+            thread.start()
+            # Keep handles for open connections only; stats calls and reconnects
+            # would otherwise grow this list for the life of the process.
+            self._threads = [t for t in self._threads if t.is_alive()]
+            self._threads.append(thread)
+
+    def _serve(self, conn):
+        with conn:
+            while True:
+                # Samples stay pickled here; they are only decoded by the scorer,
+                # so that work is counted against max_cpu_share.
+                try:
+                    message = conn.recv_bytes()
+                except (EOFError, OSError):
+                    break
+
+                if message == _STATS_REQUEST:
+                    conn.send(self.snapshot())
+                    continue
+
+                try:
+                    self._queue.put_nowait(message)
+                    with self._lock:
+                        self._received += 1
+                except queue.Full:
+                    with self._lock:
+                        self._dropped += 1
+
+    def _score(self):
+        max_cpu_share = self.shadow_config.max_cpu_share
+
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+
+            cpu_start = time.process_time()
+            try:
+                features, live_pred, live_latency = pickle.loads(item)
+
+                start = time.perf_counter()
+                shadow_pred = self._model.predict(self._preprocessor.transform(features))
+                latency = time.perf_counter() - start
+
+                with self._lock:
+                    self._live_latency.update(live_latency)
+                    self._shadow_latency.update(latency)
+                    for live, shadow in zip(live_pred, shadow_pred):
+                        delta = float(shadow) - float(live)
+                        self._delta.update(delta)
+                        self._abs_delta.update(abs(delta))
+            except Exception as e:
+                with self._lock:
+                    self._errors += 1
+                logger.error(f"Exception occured while trying to score the shadow model: {e}")
+            finally:
+                # Idle long enough that busy time stays within max_cpu_share
+                cpu_used = time.process_time() - cpu_start
+                time.sleep(cpu_used * (1 - max_cpu_share) / max_cpu_share)
+
+
+class ShadowEvaluator:
+    """
+    Web worker side of shadow evaluation. Sampled requests go into a bounded queue and a
+    sender thread forwards them to the ShadowServer process; nothing is scored in the
+    worker, and samples are dropped when the queue is full or the server is unreachable.
+    """
+
+    def __init__(self, config: ShadowConfig = None) -> None:
+        self.shadow_config = config or read_shadow_config()
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=self.shadow_config.queue_size)
+        self._conn = None
+        self._sender = None
+        self._dropped = 0
+        self._unreachable = False
+
+    def start(self):
+        """
+        This function is used to start forwarding samples to the shadow evaluator process.
+        """
+        try:
+            if not candidate_is_available(self.shadow_config):
+                return self
+            if not channel_is_configured(self.shadow_config):
+                logger.warning(
+                    "Shadow sampling disabled: no evaluator channel configured, "
+                    "start the app with gunicorn --config gunicorn.conf.py."
+                )
+                return self
+
+            self._sender = threading.Thread(
+                target=self._send, name="shadow-sender", daemon=True
+            )
+            self._sender.start()
+            self.enabled = True
+            logger.info(
+                f"Shadow sampling started with sample rate {self.shadow_config.sample_rate}"
+            )
+        except Exception as e:
+            logger.error(f"Exception occured while trying to start shadow sampling: {e}")
+            self.enabled = False
+
+        return self
+
+    def submit(self, features, live_pred, live_latency: float):
+        """
+        This function is used to hand a served request over to the shadow evaluator.
+        arg1: raw feature DataFrame given to the live model
+        arg2: live model prediction array
+        arg3: live model latency in seconds
+        """
+        if not self.enabled or random.random() >= self.shadow_config.sample_rate:
+            return
+
+        try:
+            self._queue.put_nowait((features, live_pred, live_latency))
+        except queue.Full:
+            with self._lock:
+                self._dropped += 1
+
+    def snapshot(self):
+        """
+        This function is used to read the aggregates from the shadow evaluator process.
+        """
+        with self._lock:
+            stats = {
+                "enabled": self.enabled,
+                "sample_rate": self.shadow_config.sample_rate,
+                "worker_dropped": self._dropped,
+                "evaluator": None,
+            }
+
+        if self.enabled:
+            try:
+                with Client(
+                    self.shadow_config.address, authkey=self.shadow_config.authkey
+                ) as conn:
+                    conn.send_bytes(_STATS_REQUEST)
+                    if conn.poll(1.0):
+                        stats["evaluator"] = conn.recv()
+            except (OSError, EOFError, AuthenticationError) as e:
+                logger.error(f"Exception occured while trying to read shadow stats: {e}")
+
+        return stats
+
+    def close(self):
+        """
+        This function is used to stop the sender thread once the queued samples are sent.
+        """
+        if self._sender is None:
+            return
+
+        self.enabled = False
+        self._queue.put(_STOP)
+        self._sender.join()
+        self._sender = None
+
+    def _send(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+
+            try:
+                if self._conn is None:
+                    self._conn = self._connect()
+                self._conn.send(item)
+            except (OSError, EOFError, AuthenticationError):
+                if self._conn is not None:
+                    self._conn.close()
+                    self._conn = None
+                with self._lock:
+                    self._dropped += 1
+
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _connect(self):
+        try:
+            conn = Client(self.shadow_config.address, authkey=self.shadow_config.authkey)
+        except (OSError, EOFError, AuthenticationError) as e:
+            # Warn once per outage; further failures only show up in worker_dropped
+            if not self._unreachable:
+                self._unreachable = True
+                logger.warning(
+                    f"Shadow evaluator unreachable at {self.shadow_config.address}, "
+                    f"dropping samples until it is up: {e}"
+                )
+            raise
+        self._unreachable = False
+        return conn
+
+
+if __name__ == "__main__":
+    try:
+        os.nice(19)
+    except (AttributeError, OSError):
+        pass
+
+    server = ShadowServer().load().start()
+    if server.enabled:
+        server.serve_forever()
@@ -1,6 +1,26 @@
 import pytest
 import os
+import pickle
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+from sklearn.compose import ColumnTransformer
+from sklearn.linear_model import LinearRegression
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
 from app import app
+from src.components.feature_engineering import (
+    FeatureEngineering,
+    FEATURE_COLUMNS,
+    with_feature_engineering,
+)
+from src.pipeline.shadow_pipeline import (
+    ShadowConfig,
+    ShadowEvaluator,
+    ShadowServer,
+    read_shadow_config,
+)
 
 @pytest.fixture
 def client():
@@ -10,6 +30,22 @@ def client():
     with app.test_client() as client:
         yield client
 
+@pytest.fixture
+def shadow_socket():
+    """AF_UNIX paths are capped at ~104 bytes, so avoid the long macOS tmp_path."""
+    socket_dir = tempfile.mkdtemp(dir="/tmp")
+    yield os.path.join(socket_dir, "shadow.sock")
+    shutil.rmtree(socket_dir, ignore_errors=True)
+
+@pytest.fixture
+def raw_gemstones():
+    """Two gemstones in the raw measurement schema the app and batch scorers send."""
+    return pd.DataFrame({
+        "carat": [0.7, 1.0], "x": [5.7, 6.4], "y": [5.72, 6.4], "z": [3.52, 3.9],
+        "depth": [61.5, 61.0], "table": [55.0, 56.0], "cut": ["Ideal", "Good"],
+        "color": ["E", "G"], "clarity": ["SI1", "VS2"]
+    })
+
 def test_homepage(client):
     response = client.get('/')
     assert response.status_code == 200
@@ -26,7 +62,7 @@ def artifacts_are_valid():
 @pytest.mark.skipif(not artifacts_are_valid(), reason="Real model files not found (Git LFS pointers or missing).")
 def test_prediction_endpoint(client):
     test_data = {
-        "log_carat": "0.5", "volume": "150.0", "depth": "61.5",
+        "carat": "0.7", "x": "5.7", "y": "5.72", "z": "3.52", "depth": "61.5",
         "table": "55.0", "cut": "Ideal", "color": "E", "clarity": "SI1"
     }
     response = client.post('/predict', data=test_data, follow_redirects=True)
@@ -34,9 +70,116 @@ def test_prediction_endpoint(client):
 
 def test_invalid_input_handling(client):
     """Test that the app handles bad input without crashing the server."""
-    bad_data = {"log_carat": "not-a-number"}
+    bad_data = {"carat": "not-a-number"}
     
     # We EXPECT this to trigger your CustomException (which Flask returns as 500)
     # The test passes if the server handles it rather than crashing
     response = client.post('/predict', data=bad_data)
-    assert response.status_code in [400, 500]
\ No newline at end of file
+    assert response.status_code in [400, 500]
+
+def test_non_positive_measurements_rejected(client):
+    """Zero or negative carat/x/y/z would give NaN features, so they are a 400."""
+    bad_data = {
+        "carat": "-1", "x": "5.7", "y": "5.72", "z": "0", "depth": "61.5",
+        "table": "55.0", "cut": "Ideal", "color": "E", "clarity": "SI1"
+    }
+    response = client.post('/predict', data=bad_data)
+    assert response.status_code == 400
+
+def test_feature_engineering_from_raw_measurements(raw_gemstones):
+    """The shared feature step derives log_carat and volume from the raw columns."""
+    features = FeatureEngineering().fit_transform(raw_gemstones)
+
+    assert list(features.columns) == FEATURE_COLUMNS
+    assert np.isclose(features["log_carat"][0], np.log1p(0.7))
+    assert np.isclose(features["volume"][0], 5.7 * 5.72 * 3.52)
+
+
+def test_shadow_metrics_endpoint(client):
+    """Without a configured candidate the shadow path stays disabled."""
+    response = client.get('/shadow')
+    assert response.status_code == 200
+    assert response.get_json()["enabled"] is False
+
+
+def test_shadow_config_is_clamped_or_disabled(monkeypatch):
+    config = ShadowConfig(sample_rate=5.0, queue_size=0)
+    assert config.sample_rate == 1.0
+    assert config.queue_size == 1
+
+    monkeypatch.setenv("SHADOW_SAMPLE_RATE", "not-a-number")
+    assert read_shadow_config().sample_rate == 0.0
+
+
+def test_shadow_evaluator_records_streaming_deltas(tmp_path, raw_gemstones, shadow_socket):
+    """Sampled requests are scored by the evaluator process and only aggregates are kept."""
+    features = raw_gemstones
+
+    preprocessor = Pipeline(steps=[
+        ("feature_engineering", FeatureEngineering()),
+        ("column_transformer", ColumnTransformer([("num", "passthrough", ["volume", "log_carat"])])),
+    ])
+    model = LinearRegression().fit(preprocessor.fit_transform(features), [1.0, 2.0])
+
+    model_path, preprocessor_path = tmp_path / "model.pkl", tmp_path / "preprocessor.pkl"
+    model_path.write_bytes(pickle.dumps(model))
+    preprocessor_path.write_bytes(pickle.dumps(preprocessor))
+
+    config = ShadowConfig(
+        candidate_model_file_path=str(model_path),
+        candidate_preprocessor_file_path=str(preprocessor_path),
+        address=shadow_socket,
+        authkey=b"test-authkey",
+        sample_rate=1.0,
+        max_cpu_share=1.0,
+    )
+    server = ShadowServer(config).load().start()
+    evaluator = ShadowEvaluator(config).start()
+    assert server.enabled and evaluator.enabled
+
+    for _ in range(3):
+        evaluator.submit(features, np.array([0.0, 0.0]), 0.001)
+    evaluator.close()
+    server.close()
+
+    stats = server.snapshot()
+    assert stats["received"] == 3
+    assert stats["errors"] == 0
+    assert stats["live_latency_seconds"]["count"] == 3
+    assert stats["prediction_delta"]["count"] == 6
+    assert np.isclose(stats["prediction_delta"]["mean"], 1.5)
+
+
+def test_shadow_server_survives_a_bad_candidate(tmp_path):
+    for name in ("model.pkl", "preprocessor.pkl"):
+        (tmp_path / name).write_text("version https://git-lfs.github.com/spec/v1\n")
+
+    config = ShadowConfig(
+        candidate_model_file_path=str(tmp_path / "model.pkl"),
+        candidate_preprocessor_file_path=str(tmp_path / "preprocessor.pkl"),
+        sample_rate=1.0,
+    )
+    assert ShadowServer(config).load().enabled is False
+
+
+def test_shadow_server_refuses_to_listen_without_authkey(tmp_path, shadow_socket):
+    """Samples are pickled, so the evaluator never accepts unauthenticated connections."""
+    for name in ("model.pkl", "preprocessor.pkl"):
+        (tmp_path / name).write_bytes(pickle.dumps(LinearRegression()))
+
+    config = ShadowConfig(
+        candidate_model_file_path=str(tmp_path / "model.pkl"),
+        candidate_preprocessor_file_path=str(tmp_path / "preprocessor.pkl"),
+        address=shadow_socket,
+        sample_rate=1.0,
+    )
+    assert ShadowServer(config).load().start().enabled is False
+    assert not os.path.exists(config.address)
+
+
+def test_legacy_preprocessor_accepts_raw_measurements(raw_gemstones):
+    """A ColumnTransformer saved before the feature step still serves raw inputs."""
+    engineered = pd.DataFrame({"volume": [100.0, 120.0], "log_carat": [0.4, 0.5]})
+    legacy = ColumnTransformer([("num", StandardScaler(), ["volume", "log_carat"])]).fit(engineered)
+
+    assert with_feature_engineering(legacy).transform(raw_gemstones).shape == (2, 2)